@@ -5,341 +5,396 @@ Parses Paradox game script files (.txt) into Python dictionaries.
 Handles the nested brace syntax used in EU5 and other Clausewitz games.
 """
 
+import itertools
+import mmap
+import os
 import re
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Union
+from typing import Any, Iterable, Iterator, Union
+
+
+# Matches one token, skipping any whitespace in front of it. A character that
+# can't start a token matches the last alternative outside the group and comes
+# back from findall() as '' - parsing always stops there.
+_TOKEN_RE = re.compile(r'''
+    [ \t\n\r]*
+    (?:
+        (
+            [{}]                # braces
+          | [<>=]=? | [!?]=     # operators
+          | "[^"]*"?            # quoted string (unclosed runs to end of text)
+          | [\w:.\-@]+          # identifier or number
+        )
+      | [^ \t\n\r]
+    )
+''', re.VERBOSE)
+
+# A quoted string (kept as is, so a # inside it survives) or a # comment running
+# to the end of the line. Quotes never span lines here, same as the old per-line
+# scan: an unclosed quote protects the rest of its line only.
+_COMMENT_RE = re.compile(r'("[^"\n]*"?)|#[^\n]*')
+
+# yes/no in any letter case, for _convert_value
+_TRUE_TOKENS = frozenset(map(''.join, itertools.product('yY', 'eE', 'sS')))
+_FALSE_TOKENS = frozenset(map(''.join, itertools.product('nN', 'oO')))
+
+# Characters a number token can start with: digits, signs, '.', and the
+# whitespace int() and float() skip, which quoted values may start with
+_NUMBER_START = frozenset('+-.0123456789') | frozenset(
+    c for c in map(chr, range(128)) if c.isspace())
 
 
 class ClausewitzParser:
-    """Parser for Clausewitz engine script files."""
+    """Parser for Clausewitz engine script files.
 
-    def __init__(self):
-        self.pos = 0
-        self.text = ""
-        self.length = 0
+    Thin wrapper around the module-level parsing functions, which keep all
+    their state in locals and are safe to run concurrently.
+    """
 
     def parse_file(self, filepath: Union[str, Path]) -> dict:
         """Parse a single file and return its contents as a dictionary."""
-        filepath = Path(filepath)
-
-        # Read file with UTF-8-BOM handling
-        with open(filepath, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
-
-        return self.parse(content)
+        return self.parse(_read_file(filepath))
 
     def parse(self, text: str) -> dict:
         """Parse text content and return as dictionary."""
-        # Remove comments
-        text = self._remove_comments(text)
-
-        self.text = text
-        self.length = len(text)
-        self.pos = 0
-
-        return self._parse_block()
-
-    def _remove_comments(self, text: str) -> str:
-        """Remove # comments from text."""
-        lines = text.split('\n')
-        result = []
-        for line in lines:
-            # Find # not inside quotes
-            in_quote = False
-            comment_pos = -1
-            for i, char in enumerate(line):
-                if char == '"':
-                    in_quote = not in_quote
-                elif char == '#' and not in_quote:
-                    comment_pos = i
-                    break
-
-            if comment_pos >= 0:
-                result.append(line[:comment_pos])
-            else:
-                result.append(line)
-
-        return '\n'.join(result)
-
-    def _skip_whitespace(self):
-        """Skip whitespace characters."""
-        while self.pos < self.length and self.text[self.pos] in ' \t\n\r':
-            self.pos += 1
-
-    def _peek(self) -> str:
-        """Look at current character without consuming."""
-        if self.pos >= self.length:
-            return ''
-        return self.text[self.pos]
-
-    def _read_token(self) -> str:
-        """Read the next token (identifier, number, or quoted string)."""
-        self._skip_whitespace()
-
-        if self.pos >= self.length:
-            return ''
-
-        char = self.text[self.pos]
-
-        # Single character tokens
-        if char in '{}=<>':
-            self.pos += 1
-            # Handle >=, <=, ==
-            if char in '<>=' and self.pos < self.length and self.text[self.pos] == '=':
-                self.pos += 1
-                return char + '='
-            return char
-
-        # Handle != operator
-        if char == '!' and self.pos + 1 < self.length and self.text[self.pos + 1] == '=':
-            self.pos += 2
-            return '!='
-
-        # Handle ?= operator (null-safe equals)
-        if char == '?' and self.pos + 1 < self.length and self.text[self.pos + 1] == '=':
-            self.pos += 2
-            return '?='
-
-        # Quoted string
-        if char == '"':
-            return self._read_quoted_string()
-
-        # Identifier or number
-        return self._read_identifier()
-
-    def _read_quoted_string(self) -> str:
-        """Read a quoted string."""
-        self.pos += 1  # Skip opening quote
-        start = self.pos
-
-        while self.pos < self.length:
-            if self.text[self.pos] == '"':
-                result = self.text[start:self.pos]
-                self.pos += 1  # Skip closing quote
-                return result
-            self.pos += 1
+        return _parse_text(text)
 
-        # Unclosed quote - return what we have
-        return self.text[start:]
 
-    def _read_identifier(self) -> str:
-        """Read an identifier (alphanumeric + underscores, colons, dots, etc.)."""
-        start = self.pos
+def _parse_text(text: str) -> dict:
+    """Parse text content and return as dictionary."""
+    return _parse_block(_tokenize(_remove_comments(text)), 0)[0]
 
-        while self.pos < self.length:
-            char = self.text[self.pos]
-            # Allow alphanumeric, underscore, colon, dot, minus, at sign
-            if char.isalnum() or char in '_:.-@':
-                self.pos += 1
-            else:
-                break
 
-        return self.text[start:self.pos]
+def _read_file(filepath: Union[str, Path]) -> str:
+    """Read a script file as text, with BOM and line-ending handling."""
+    # Decode straight out of a memory map, with UTF-8-BOM handling, so the
+    # raw bytes are never copied onto the heap next to the decoded text
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ''  # Empty files can't be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            content = str(mm, 'utf-8-sig')
 
-    def _parse_block(self) -> dict:
-        """Parse a block (contents between braces or top-level)."""
-        result = {}
+    # Normalize line endings like text-mode open() did
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
 
-        while True:
-            self._skip_whitespace()
+    return content
 
-            if self.pos >= self.length:
-                break
 
-            char = self._peek()
+def _remove_comments(text: str) -> str:
+    """Remove # comments from text."""
+    if '#' not in text:
+        return text  # Nothing to strip, skip the regex pass
+    return _COMMENT_RE.sub(r'\1', text)
 
-            if char == '}':
-                self.pos += 1  # Consume closing brace
-                break
 
-            if char == '{':
-                # Anonymous block - shouldn't happen at this level normally
-                self.pos += 1
-                self._parse_block()  # Skip it
-                continue
+def _tokenize(text: str) -> list:
+    """Split text into tokens, stopping at the first unknown character.
 
-            # Read key
-            key = self._read_token()
-            if not key:
-                break
+    The list always ends with one extra entry marking the end of input: the
+    unknown character parsing stopped at, or '' at the real end of the text.
+    The parsing functions never move past it.
+    """
+    tokens = _TOKEN_RE.findall(text)
+    stray = ''
+    if '' in tokens:
+        index = tokens.index('')
+        del tokens[index:]
+        # Remember the character itself, peeking at the end still has to see it
+        match = next(itertools.islice(_TOKEN_RE.finditer(text), index, None))
+        stray = match.group()[-1]
+    tokens.append(stray)
+    return tokens
 
-            self._skip_whitespace()
 
-            # Check what follows
-            next_char = self._peek()
+# The parsing functions below take the token list and a position in it, and
+# return (result, new position). tokens[pos][:1] is the first character of the
+# next token - the end marker peeks as itself.
 
-            if next_char == '=':
-                self.pos += 1  # Consume =
-                self._skip_whitespace()
-                # Check for == (equality comparison)
-                if self._peek() == '=':
-                    self.pos += 1
-                    self._skip_whitespace()
-                    value = self._parse_value()
-                    result[key] = {'_op': '==', '_value': value}
-                else:
-                    value = self._parse_value()
-
-                    # Handle duplicate keys by converting to list
-                    if key in result:
-                        existing = result[key]
-                        if isinstance(existing, list):
-                            existing.append(value)
-                        else:
-                            result[key] = [existing, value]
-                    else:
-                        result[key] = value
-
-            elif next_char in '!?<>':
-                # Comparison operator (>=, <=, >, <, !=, ?=)
-                op = self._read_token()
-                self._skip_whitespace()
-                value = self._parse_value()
-                # Store as special comparison dict
-                result[key] = {'_op': op, '_value': value}
-
-            elif next_char == '{':
-                # Key followed directly by block (no =)
-                self.pos += 1
-                value = self._parse_block()
-                if key in result:
-                    existing = result[key]
-                    if isinstance(existing, list):
-                        existing.append(value)
-                    else:
-                        result[key] = [existing, value]
-                else:
-                    result[key] = value
+def _read_token(tokens: list, pos: int) -> tuple:
+    """Read the next token (identifier, number, operator or quoted string)."""
+    if pos >= len(tokens) - 1:
+        return '', pos
 
-            else:
-                # Key with no value - treat as flag (true)
-                result[key] = True
+    token = tokens[pos]
+    pos += 1
+
+    # Quoted string - strip the quotes
+    if token[0] == '"':
+        if len(token) > 1 and token[-1] == '"':
+            return token[1:-1], pos
+        # Unclosed quote - return what we have
+        return token[1:], pos
 
-        return result
+    return token, pos
 
-    def _parse_value(self) -> Any:
-        """Parse a value (block, list, or scalar)."""
-        self._skip_whitespace()
 
-        char = self._peek()
+def _consume_equals(tokens: list, pos: int) -> int:
+    """Consume a single '=' character, which may be half of a '==' token."""
+    if tokens[pos] == '==':
+        tokens[pos] = '='
+        return pos
+    return pos + 1
+
+
+def _parse_block(tokens: list, pos: int) -> tuple:
+    """Parse a block (contents between braces or top-level)."""
+    result = {}
+
+    while True:
+        char = tokens[pos][:1]
+
+        if not char:
+            break
+
+        if char == '}':
+            pos += 1  # Consume closing brace
+            break
 
         if char == '{':
-            self.pos += 1
-            # Could be a block or a simple list
-            return self._parse_block_or_list()
-
-        # Scalar value
-        token = self._read_token()
-
-        # Try to convert to appropriate type
-        return self._convert_value(token)
-
-    def _parse_block_or_list(self) -> Any:
-        """Parse either a block (key=value pairs) or a list (bare values)."""
-        items = []
-        is_list = None
-
-        while True:
-            self._skip_whitespace()
-
-            if self.pos >= self.length:
-                break
-
-            char = self._peek()
-
-            if char == '}':
-                self.pos += 1
-                break
-
-            if char == '{':
-                # Nested block in a list
-                self.pos += 1
-                items.append(self._parse_block())
-                if is_list is None:
-                    is_list = True
-                continue
-
-            # Read first token
-            token = self._read_token()
-            if not token:
-                break
-
-            self._skip_whitespace()
-            next_char = self._peek()
-
-            if next_char == '=' or next_char in '<>':
-                # This is a key=value pair, so it's a block
-                if is_list is True:
-                    # Mixed content - treat previous items as special
-                    pass
-                is_list = False
-
-                if next_char == '=':
-                    self.pos += 1
-                    self._skip_whitespace()
-                    value = self._parse_value()
-                else:
-                    op = self._read_token()
-                    self._skip_whitespace()
-                    value = self._parse_value()
-                    value = {'_op': op, '_value': value}
-
-                items.append((token, value))
+            # Anonymous block - shouldn't happen at this level normally
+            _, pos = _parse_block(tokens, pos + 1)  # Skip it
+            continue
+
+        # Read key - interned, the same keys repeat all over a file. That only
+        # shares one string per key within this parse: pickling a worker's
+        # result keeps the sharing, but the copies it unpickles are not interned
+        key, pos = _read_token(tokens, pos)
+        if not key:
+            break
+        key = sys.intern(key)
+
+        # Check what follows
+        next_char = tokens[pos][:1]
+
+        if next_char == '=':
+            pos = _consume_equals(tokens, pos)
+            # Check for == (equality comparison)
+            if tokens[pos][:1] == '=':
+                pos = _consume_equals(tokens, pos)
+                value, pos = _parse_value(tokens, pos)
+                result[key] = {'_op': '==', '_value': value}
             else:
-                # Bare value - this is a list
-                if is_list is False:
-                    # We already have key=value pairs, treat this as unusual
-                    items.append((token, True))
-                else:
-                    is_list = True
-                    items.append(self._convert_value(token))
-
-        # Return appropriate type
-        if is_list is True or is_list is None:
-            return items if items else {}
+                value, pos = _parse_value(tokens, pos)
+                _add_value(result, key, value)
+
+        elif next_char in '!?<>':
+            # Comparison operator (>=, <=, >, <, !=, ?=)
+            op, pos = _read_token(tokens, pos)
+            value, pos = _parse_value(tokens, pos)
+            # Store as special comparison dict
+            result[key] = {'_op': op, '_value': value}
+
+        elif next_char == '{':
+            # Key followed directly by block (no =)
+            value, pos = _parse_block(tokens, pos + 1)
+            _add_value(result, key, value)
+
         else:
-            # Convert list of tuples to dict
-            result = {}
-            for item in items:
-                if isinstance(item, tuple):
-                    key, value = item
-                    if key in result:
-                        existing = result[key]
-                        if isinstance(existing, list):
-                            existing.append(value)
-                        else:
-                            result[key] = [existing, value]
-                    else:
-                        result[key] = value
-            return result
-
-    def _convert_value(self, token: str) -> Any:
-        """Convert a string token to appropriate Python type."""
+            # Key with no value - treat as flag (true)
+            result[key] = True
+
+    return result, pos
+
+
+def _add_value(result: dict, key: str, value: Any):
+    """Store a key's value, collecting the values of a repeated key in a list."""
+    if key in result:
+        existing = result[key]
+        if type(existing) is list:
+            existing.append(value)
+        else:
+            result[key] = [existing, value]
+    else:
+        result[key] = value
+
+
+def _parse_value(tokens: list, pos: int) -> tuple:
+    """Parse a value (block, list, or scalar)."""
+    if tokens[pos][:1] == '{':
+        # Could be a block or a simple list
+        return _parse_block_or_list(tokens, pos + 1)
+
+    # Scalar value - try to convert to appropriate type
+    token, pos = _read_token(tokens, pos)
+    return _convert_value(token), pos
+
+
+def _parse_block_or_list(tokens: list, pos: int) -> tuple:
+    """Parse either a block (key=value pairs) or a list (bare values)."""
+    items = []   # Bare values, if this turns out to be a list
+    keys = []    # Keys and values of key=value pairs, if it's a block
+    values = []
+    is_list = None
+
+    while True:
+        char = tokens[pos][:1]
+
+        if not char:
+            break
+
+        if char == '}':
+            pos += 1
+            break
+
+        if char == '{':
+            # Nested block in a list
+            value, pos = _parse_block(tokens, pos + 1)
+            items.append(value)
+            if is_list is None:
+                is_list = True
+            continue
+
+        # Read first token
+        token, pos = _read_token(tokens, pos)
         if not token:
-            return token
-
-        # Boolean
-        if token.lower() == 'yes':
-            return True
-        if token.lower() == 'no':
-            return False
-
-        # Number (int or float)
-        try:
-            if '.' in token:
-                return float(token)
-            return int(token)
-        except ValueError:
-            pass
-
-        # String
+            break
+
+        next_char = tokens[pos][:1]
+
+        if next_char == '=' or next_char in '<>':
+            # This is a key=value pair, so it's a block
+            if is_list is True:
+                # Mixed content - treat previous items as special
+                pass
+            is_list = False
+
+            if next_char == '=':
+                pos = _consume_equals(tokens, pos)
+                value, pos = _parse_value(tokens, pos)
+            else:
+                op, pos = _read_token(tokens, pos)
+                value, pos = _parse_value(tokens, pos)
+                value = {'_op': op, '_value': value}
+
+            keys.append(sys.intern(token))
+            values.append(value)
+        else:
+            # Bare value - this is a list
+            if is_list is False:
+                # We already have key=value pairs, treat this as unusual
+                keys.append(sys.intern(token))
+                values.append(True)
+            else:
+                is_list = True
+                items.append(_convert_value(token))
+
+    # Return appropriate type
+    if is_list is True or is_list is None:
+        return (items if items else {}), pos
+
+    # Convert key=value pairs to dict (bare values seen before the first pair
+    # are dropped)
+    result = {}
+    for key, value in zip(keys, values):
+        _add_value(result, key, value)
+    return result, pos
+
+
+def _convert_value(token: str) -> Any:
+    """Convert a string token to appropriate Python type."""
+    if not token:
+        return token
+
+    # Boolean
+    if token in _TRUE_TOKENS:
+        return True
+    if token in _FALSE_TOKENS:
+        return False
+
+    # Plain strings are the common case, don't bother trying to convert
+    if token[0] not in _NUMBER_START:
         return token
 
+    # Number (int or float)
+    try:
+        if '.' in token:
+            return float(token)
+        return int(token)
+    except ValueError:
+        pass
+
+    # String
+    return token
+
+
+# Recently parsed files, (path, mtime_ns) -> data, least recently used first
+_parse_cache = OrderedDict()
+_PARSE_CACHE_SIZE = 1024
+
 
 def parse_file(filepath: Union[str, Path]) -> dict:
-    """Convenience function to parse a file."""
-    parser = ClausewitzParser()
-    return parser.parse_file(filepath)
+    """Convenience function to parse a file.
+
+    Results are cached by path and modification time, so parsing an unchanged
+    file again costs a stat() call. The cached dict itself is returned, callers
+    must not modify it.
+    """
+    filepath = Path(filepath)
+    key = (str(filepath), filepath.stat().st_mtime_ns)
+    data = _parse_cache.get(key)
+    if data is not None:
+        _parse_cache.move_to_end(key)
+        return data
+
+    data = _parse_text(_read_file(filepath))
+
+    _parse_cache[key] = data
+    if len(_parse_cache) > _PARSE_CACHE_SIZE:
+        _parse_cache.popitem(last=False)
+    return data
+
+
+def _parse_file_safe(filepath: Path) -> tuple:
+    """Parse a file, returning (filepath, data, error) instead of raising."""
+    # Bypasses the cache - batches of files are parsed once, often in worker
+    # processes that exit right after
+    try:
+        return filepath, _parse_text(_read_file(filepath)), None
+    except Exception as e:
+        return filepath, None, e
+
+
+# Worker processes shared by every parse_files() call, started on first use
+_executor = None
+
+
+def _usable_cpus() -> int:
+    """Number of CPUs this process may run on."""
+    # cpu_count() is the whole host's, even when a container or CI job is
+    # limited to fewer
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def parse_files(filepaths: Iterable[Union[str, Path]]) -> Iterator[tuple]:
+    """Parse several files across worker processes.
+
+    Returns an iterator of (filepath, data, error) tuples in the order the
+    files were given. error is the exception raised while parsing that file,
+    or None. The files are queued up for the workers right away, so several
+    calls can be made before reading any of the results to keep the workers
+    busy from one batch to the next.
+    """
+    global _executor
+    filepaths = list(filepaths)
+
+    # Not worth using worker processes for a single file or CPU
+    workers = _usable_cpus()
+    if len(filepaths) < 2 or workers < 2:
+        return map(_parse_file_safe, filepaths)
+
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=workers)
+
+    # Hand out files in batches, but keep enough batches to balance the load
+    chunksize = max(1, len(filepaths) // (workers * 4))
+    return _executor.map(_parse_file_safe, filepaths, chunksize=chunksize)
 
 
 def parse_all_in_directory(dirpath: Union[str, Path], pattern: str = "*.txt") -> dict:
@@ -347,19 +402,17 @@ def parse_all_in_directory(dirpath: Union[str, Path], pattern: str = "*.txt") ->
     dirpath = Path(dirpath)
     combined = {}
 
-    for filepath in sorted(dirpath.glob(pattern)):
-        try:
-            data = parse_file(filepath)
+    for filepath, data, error in parse_files(sorted(dirpath.glob(pattern))):
+        if error is not None:
+            print(f"Warning: Failed to parse {filepath}: {error}")
+        else:
             combined.update(data)
-        except Exception as e:
-            print(f"Warning: Failed to parse {filepath}: {e}")
 
     return combined
 
 
 if __name__ == "__main__":
     # Test with a sample file
-    import sys
     if len(sys.argv) > 1:
         result = parse_file(sys.argv[1])
         import json
@@ -6,14 +6,21 @@ Extracts game data from EU5 files and generates JSON for the web viewer.
 """
 
 import json
+import mmap
 import re
 import sys
+from collections import Counter
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
-from clausewitz import parse_file, parse_all_in_directory
+from clausewitz import parse_file, parse_files, parse_all_in_directory
 import utils
 
+try:
+    import orjson  # Optional, much faster for writing the output files
+except ImportError:
+    orjson = None
+
 
 # Base path to game files
 GAME_PATH = Path(__file__).parent.parent
@@ -22,6 +29,79 @@ SETUP_PATH = GAME_PATH / "setup"
 EVENTS_PATH = GAME_PATH / "events"
 OUTPUT_PATH = GAME_PATH / "values-viewer" / "data"
 
+# Country header line with the name in a comment, like "YEM = { #Yemen" or
+# "YEM = {#Yemen". Run over a whole file's raw bytes, so whitespace is [^\S\n]
+# to keep each match on one line, and a UTF-8 BOM may start the first line.
+_TAG_NAME_RE = re.compile(
+    rb'(?:^|\A\xef\xbb\xbf)[^\S\n]*([A-Z]{3})[^\S\n]*=[^\S\n]*\{?[^\S\n]*#[^\S\n]*(.*\S)',
+    re.MULTILINE)
+
+# Keys buildings keep their modifier blocks under
+_BUILDING_MODIFIER_KEYS = (
+    'country_modifier', 'capital_country_modifier', 'province_modifier',
+    'modifier', 'location_modifier', 'area_modifier'
+)
+
+# Keys checked for modifier blocks at every level of a generic item
+_GENERIC_MODIFIER_KEYS = (
+    'country_modifier', 'modifier', 'province_modifier', 'effect',
+    'capital_country_modifier', 'modifier_when_in_debate', 'high_power',
+    'low_power', 'satisfaction', 'location_modifier', 'area_modifier'
+)
+
+# Blocks holding conditions, which never contain value effects
+_TRIGGER_BLOCK_KEYS = frozenset({
+    'trigger', 'potential', 'allow', 'limit', 'mean_time_to_happen'
+})
+
+# Strength of a one-off change_societal_value, by the size named in its value
+# (e.g. societal_value_minor_move_to_left). First match wins.
+_MOVE_STRENGTHS = (
+    ('tiny', 0.02),
+    ('minor', 0.05),
+    ('large', 0.20),
+    ('huge', 0.50),
+)
+
+
+def _dict_children(data: dict) -> Iterator[tuple]:
+    """Iterate over the (key, value) pairs of data whose value is a block."""
+    return ((key, value) for key, value in data.items() if type(value) is dict)
+
+
+def _walk_blocks(data: dict) -> Iterator[dict]:
+    """Iterate over data and every block nested in it, in file order.
+
+    Blocks in lists are included. Trigger blocks and everything in them are
+    skipped, they're conditions only and never hold value effects.
+    """
+    # Walk with a stack instead of recursing. Nested blocks go on it last
+    # first, so they're popped in order
+    stack = [data]
+    while stack:
+        block = stack.pop()
+        yield block
+
+        nested = []
+        for key, value in block.items():
+            if key in _TRIGGER_BLOCK_KEYS:
+                continue
+            if type(value) is dict:
+                nested.append(value)
+            elif type(value) is list:
+                for item in value:
+                    if type(item) is dict:
+                        nested.append(item)
+        stack.extend(reversed(nested))
+
+
+def _classify_strength(sv_value: str) -> float:
+    """Get the strength of a change_societal_value from its value name."""
+    for size, strength in _MOVE_STRENGTHS:
+        if size in sv_value:
+            return strength
+    return 0.10  # default "move"
+
 
 def extract_values() -> dict:
     """Extract societal value pair definitions."""
@@ -31,22 +111,21 @@ def extract_values() -> dict:
     data = parse_file(values_file)
 
     values = {}
+    sides = {}  # Added to utils.VALUE_SIDES in one go at the end
 
     for key, value_data in data.items():
-        if not isinstance(value_data, dict):
-            continue
-
-        # Parse value pair name
-        if '_vs_' in key:
-            parts = key.split('_vs_')
-            left_id = parts[0]
-            right_id = '_'.join(parts[1:]) if len(parts) > 1 else parts[0]
-        else:
+        # Parse value pair name - checked first, it rules out most entries
+        left_id, sep, right_id = key.partition('_vs_')
+        if not sep:
             continue  # Skip non-value entries
+        right_id = right_id.replace('_vs_', '_')  # A second '_vs_' becomes '_'
+
+        if type(value_data) is not dict:
+            continue
 
         # Register the value sides for lookup
-        utils.VALUE_SIDES[left_id] = (key, 'left')
-        utils.VALUE_SIDES[right_id] = (key, 'right')
+        sides[left_id] = (key, 'left')
+        sides[right_id] = (key, 'right')
 
         # Extract age requirement
         age_req = value_data.get('age')
@@ -70,6 +149,8 @@ def extract_values() -> dict:
             'conditions': conditions
         }
 
+    utils.VALUE_SIDES.update(sides)
+
     print(f"  Found {len(values)} value pairs")
     return values
 
@@ -84,10 +165,10 @@ def extract_ages() -> dict:
     ages = {}
 
     for key, age_data in data.items():
-        if not isinstance(age_data, dict):
-            continue
         if not key.startswith('age_'):
             continue
+        if type(age_data) is not dict:
+            continue
 
         year = age_data.get('year', 0)
 
@@ -98,7 +179,7 @@ def extract_ages() -> dict:
         }
 
     # Sort by year
-    ages = dict(sorted(ages.items(), key=lambda x: x[1]['year']))
+    ages = {key: ages[key] for key in sorted(ages, key=lambda k: ages[k]['year'])}
 
     print(f"  Found {len(ages)} ages")
     return ages
@@ -113,10 +194,7 @@ def extract_governments() -> dict:
 
     governments = {}
 
-    for key, gov_data in data.items():
-        if not isinstance(gov_data, dict):
-            continue
-
+    for key, gov_data in _dict_children(data):
         governments[key] = {
             'id': key,
             'name': utils.prettify_id(key),
@@ -134,14 +212,12 @@ def extract_religions() -> dict:
     religions_path = COMMON_PATH / "religions"
     religions = {}
 
-    for filepath in religions_path.glob("*.txt"):
+    for filepath, data, error in parse_files(religions_path.glob("*.txt")):
         try:
-            data = parse_file(filepath)
-
-            for key, rel_data in data.items():
-                if not isinstance(rel_data, dict):
-                    continue
+            if error is not None:
+                raise error
 
+            for key, rel_data in _dict_children(data):
                 group = rel_data.get('group', 'unknown')
 
                 religions[key] = {
@@ -163,26 +239,27 @@ def extract_countries() -> dict:
     countries_path = SETUP_PATH / "countries"
     countries = {}
 
-    for filepath in countries_path.glob("*.txt"):
+    # The files are parsed in worker processes while the names are read here
+    for filepath, data, error in parse_files(countries_path.glob("*.txt")):
         try:
-            # First pass: extract tag -> name from comments
+            if error is not None:
+                raise error
+
+            if not data:
+                continue  # Nothing to name (and empty files can't be mapped)
+
+            # Extract tag -> name from comments, scanning the raw bytes - the
+            # file was already decoded for parsing, so it's valid UTF-8
             # Format: TAG = { #Name
             tag_names = {}
-            with open(filepath, 'r', encoding='utf-8-sig') as f:
-                for line in f:
-                    # Match patterns like "YEM = { #Yemen" or "YEM = {#Yemen"
-                    match = re.match(r'^([A-Z]{3})\s*=\s*\{?\s*#(.+)$', line.strip())
-                    if match:
-                        tag = match.group(1)
-                        name = match.group(2).strip()
-                        tag_names[tag] = name
-
-            # Second pass: parse the file for actual data
-            data = parse_file(filepath)
-
-            for tag, country_data in data.items():
-                if not isinstance(country_data, dict):
-                    continue
+            with open(filepath, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for match in _TAG_NAME_RE.finditer(mm):
+                        name = match.group(2).decode('utf-8').strip()
+                        if name:
+                            tag_names[match.group(1).decode('ascii')] = name
+
+            for tag, country_data in _dict_children(data):
                 if len(tag) != 3:  # Country tags are 3 letters
                     continue
 
@@ -211,9 +288,7 @@ def extract_estates() -> dict:
 
     estates = {}
 
-    for key, estate_data in data.items():
-        if not isinstance(estate_data, dict):
-            continue
+    for key, estate_data in _dict_children(data):
         # Accept any key that looks like an estate definition
         if '_estate' not in key and key != 'crown_estate':
             continue
@@ -237,26 +312,29 @@ def extract_advances_definitions():
 
     This must be called before extracting movers so that items requiring advances
     can have the advance's requirements merged in.
+
+    Returns the parse_files() results for the advance files, so the advances
+    can be extracted as value movers without parsing them a second time.
     """
     print("Extracting advance definitions...")
 
     advances_path = COMMON_PATH / "advances"
     if not advances_path.exists():
         print("  No advances directory found")
-        return
+        return []
+
+    parsed = list(parse_files(sorted(advances_path.glob("*.txt"))))
 
     count = 0
-    for filepath in sorted(advances_path.glob("*.txt")):
+    for filepath, data, error in parsed:
         try:
-            data = parse_file(filepath)
-
-            for advance_id, advance_data in data.items():
-                if not isinstance(advance_data, dict):
-                    continue
+            if error is not None:
+                raise error
 
+            for advance_id, advance_data in _dict_children(data):
                 # Extract requirements from potential block
                 requirements = {}
-                if 'potential' in advance_data and isinstance(advance_data['potential'], dict):
+                if 'potential' in advance_data and type(advance_data['potential']) is dict:
                     _extract_advance_potential(advance_data['potential'], requirements)
 
                 # Get age requirement
@@ -273,6 +351,7 @@ def extract_advances_definitions():
             print(f"  Warning: Failed to parse {filepath}: {e}")
 
     print(f"  Found {count} advance definitions")
+    return parsed
 
 
 def _extract_advance_potential(potential: dict, requirements: dict):
@@ -294,7 +373,7 @@ def _extract_advance_potential(potential: dict, requirements: dict):
     # Culture with has_culture_group
     if 'culture' in potential:
         culture_block = potential['culture']
-        if isinstance(culture_block, dict):
+        if type(culture_block) is dict:
             if 'has_culture_group' in culture_block:
                 cg = culture_block['has_culture_group']
                 if isinstance(cg, str) and ':' in cg:
@@ -320,7 +399,7 @@ def _extract_advance_potential(potential: dict, requirements: dict):
             requirements.setdefault('country', []).append(tag)
 
     # OR blocks - recurse
-    if 'OR' in potential and isinstance(potential['OR'], dict):
+    if 'OR' in potential and type(potential['OR']) is dict:
         requirements['has_or_condition'] = True
         _extract_advance_potential(potential['OR'], requirements)
 
@@ -328,15 +407,23 @@ def _extract_advance_potential(potential: dict, requirements: dict):
     utils._extract_trigger_requirements(potential, requirements)
 
 
-def extract_value_movers(category: str, path: Path, extractor_fn) -> list:
-    """Generic extractor for items that affect values."""
+def extract_value_movers(category: str, path: Path, extractor_fn, parsed=None) -> list:
+    """Generic extractor for items that affect values.
+
+    parsed is the parse_files() result for the files of path, if parsing them
+    was already started. They're parsed here otherwise.
+    """
     print(f"Extracting {category}...")
 
     items = []
 
-    for filepath in sorted(path.glob("*.txt")):
+    if parsed is None:
+        parsed = parse_files(sorted(path.glob("*.txt")))
+
+    for filepath, data, error in parsed:
         try:
-            data = parse_file(filepath)
+            if error is not None:
+                raise error
             extracted = extractor_fn(data, filepath.stem)
             items.extend(extracted)
         except Exception as e:
@@ -346,17 +433,31 @@ def extract_value_movers(category: str, path: Path, extractor_fn) -> list:
     return items
 
 
+def extract_file_movers(category: str, filepath: Path, extractor_fn) -> list:
+    """Extractor for items that affect values, defined in a single file.
+
+    The items get the name of the file's directory as their source.
+    """
+    print(f"Extracting {category}...")
+
+    try:
+        items = extractor_fn(parse_file(filepath), filepath.parent.name)
+    except Exception as e:
+        print(f"  Warning: Failed to parse {category}: {e}")
+        return []
+
+    print(f"  Found {len(items)} {category} with value effects")
+    return items
+
+
 def extract_reforms_from_data(data: dict, source: str) -> list:
     """Extract government reforms from parsed data."""
     items = []
 
-    for key, reform_data in data.items():
-        if not isinstance(reform_data, dict):
-            continue
-
+    for key, reform_data in _dict_children(data):
         # Get modifier block
-        modifiers = reform_data.get('country_modifier', {})
-        if not isinstance(modifiers, dict):
+        modifiers = reform_data.get('country_modifier')
+        if type(modifiers) is not dict:
             continue
 
         # Extract value effects
@@ -387,22 +488,23 @@ def extract_laws_from_data(data: dict, source: str) -> list:
     """Extract laws from parsed data."""
     items = []
 
-    for law_key, law_data in data.items():
-        if not isinstance(law_data, dict):
-            continue
-
+    for law_key, law_data in _dict_children(data):
         law_category = law_data.get('law_category', source)
 
+        # Requirements from the law's own potential/allow blocks, the same for
+        # every policy - worked out for the first policy that needs them
+        law_requirements = None
+
         # Laws contain multiple policies
         for policy_key, policy_data in law_data.items():
-            if not isinstance(policy_data, dict):
+            if type(policy_data) is not dict:
                 continue
             if policy_key in ['law_category', 'potential', 'allow']:
                 continue
 
             # Get modifier block
-            modifiers = policy_data.get('country_modifier', {})
-            if not isinstance(modifiers, dict):
+            modifiers = policy_data.get('country_modifier')
+            if type(modifiers) is not dict:
                 continue
 
             # Extract value effects
@@ -414,14 +516,21 @@ def extract_laws_from_data(data: dict, source: str) -> list:
             # Extract requirements
             requirements = utils.extract_requirements(policy_data)
             # Add law-level requirements
-            if 'potential' in law_data:
-                utils._extract_trigger_requirements(law_data.get('potential', {}), requirements)
-            if 'allow' in law_data:
-                utils._extract_trigger_requirements(law_data.get('allow', {}), requirements)
+            if law_requirements is None:
+                law_requirements = {}
+                if 'potential' in law_data:
+                    utils._extract_trigger_requirements(law_data['potential'], law_requirements)
+                if 'allow' in law_data:
+                    utils._extract_trigger_requirements(law_data['allow'], law_requirements)
+            for req_key, req_value in law_requirements.items():
+                if type(req_value) is list:
+                    requirements.setdefault(req_key, []).extend(req_value)
+                else:
+                    requirements[req_key] = req_value
 
             # Get estate preferences
             estate_prefs = policy_data.get('estate_preferences', [])
-            if isinstance(estate_prefs, dict):
+            if type(estate_prefs) is dict:
                 estate_prefs = list(estate_prefs.keys())
 
             # Resolve advance requirements
@@ -446,13 +555,10 @@ def extract_privileges_from_data(data: dict, source: str) -> list:
     """Extract estate privileges from parsed data."""
     items = []
 
-    for key, priv_data in data.items():
-        if not isinstance(priv_data, dict):
-            continue
-
+    for key, priv_data in _dict_children(data):
         # Get modifier block
-        modifiers = priv_data.get('country_modifier', {})
-        if not isinstance(modifiers, dict):
+        modifiers = priv_data.get('country_modifier')
+        if type(modifiers) is not dict:
             continue
 
         # Extract value effects
@@ -486,13 +592,10 @@ def extract_traits_from_data(data: dict, source: str) -> list:
     """Extract traits from parsed data."""
     items = []
 
-    for key, trait_data in data.items():
-        if not isinstance(trait_data, dict):
-            continue
-
+    for key, trait_data in _dict_children(data):
         # Get modifier block - traits use "modifier" key
-        modifiers = trait_data.get('modifier', {})
-        if not isinstance(modifiers, dict):
+        modifiers = trait_data.get('modifier')
+        if type(modifiers) is not dict:
             continue
 
         # Extract value effects
@@ -525,20 +628,12 @@ def extract_buildings_from_data(data: dict, source: str) -> list:
     """Extract buildings from parsed data."""
     items = []
 
-    for key, building_data in data.items():
-        if not isinstance(building_data, dict):
-            continue
-
+    for key, building_data in _dict_children(data):
         # Get modifier block - buildings can use various keys
         all_effects = []
-        modifier_keys = [
-            'country_modifier', 'capital_country_modifier', 'province_modifier',
-            'modifier', 'location_modifier', 'area_modifier'
-        ]
-
-        for mod_key in modifier_keys:
-            modifiers = building_data.get(mod_key, {})
-            if isinstance(modifiers, dict):
+        for mod_key in _BUILDING_MODIFIER_KEYS:
+            modifiers = building_data.get(mod_key)
+            if type(modifiers) is dict:
                 effects = utils.extract_value_effects(modifiers)
                 all_effects.extend(effects)
 
@@ -569,13 +664,10 @@ def extract_religious_aspects_from_data(data: dict, source: str) -> list:
     """Extract religious aspects from parsed data."""
     items = []
 
-    for key, aspect_data in data.items():
-        if not isinstance(aspect_data, dict):
-            continue
-
+    for key, aspect_data in _dict_children(data):
         # Get modifier block - religious aspects use "modifier" key
-        modifiers = aspect_data.get('modifier', {})
-        if not isinstance(modifiers, dict):
+        modifiers = aspect_data.get('modifier')
+        if type(modifiers) is not dict:
             continue
 
         # Extract value effects
@@ -592,7 +684,7 @@ def extract_religious_aspects_from_data(data: dict, source: str) -> list:
         for k, v in aspect_data.items():
             if k == 'religion' and isinstance(v, str):
                 religions.append(v)
-            elif k == 'religion' and isinstance(v, list):
+            elif k == 'religion' and type(v) is list:
                 religions.extend(v)
 
         if religions:
@@ -616,15 +708,14 @@ def extract_parliament_issues_from_data(data: dict, source: str) -> list:
     """Extract parliament issues from parsed data."""
     items = []
 
-    for key, issue_data in data.items():
-        if not isinstance(issue_data, dict):
-            continue
-
-        # Get modifier block - parliament issues use "modifier_when_in_debate"
-        modifiers = issue_data.get('modifier_when_in_debate', {})
-        if not isinstance(modifiers, dict):
-            modifiers = issue_data.get('modifier', {})
-        if not isinstance(modifiers, dict):
+    for key, issue_data in _dict_children(data):
+        # Get modifier block - parliament issues use "modifier_when_in_debate",
+        # falling back to "modifier" only if that's present but not a block
+        # (an issue without one has no effects)
+        modifiers = issue_data.get('modifier_when_in_debate')
+        if modifiers is not None and type(modifiers) is not dict:
+            modifiers = issue_data.get('modifier')
+        if type(modifiers) is not dict:
             continue
 
         # Extract value effects
@@ -639,7 +730,12 @@ def extract_parliament_issues_from_data(data: dict, source: str) -> list:
         # Get estate if present
         estate = issue_data.get('estate')
         if estate:
-            requirements['estate'] = [estate] if isinstance(estate, str) else estate
+            if isinstance(estate, str):
+                requirements['estate'] = [estate]
+            elif type(estate) is list:
+                requirements['estate'] = list(estate)  # A copy, more may be added to it
+            else:
+                requirements['estate'] = estate
 
         requirements = utils.resolve_advance_requirements(requirements)
 
@@ -660,10 +756,7 @@ def extract_auto_modifiers_from_data(data: dict, source: str) -> list:
     """Extract auto modifiers - these have monthly_towards_* at top level."""
     items = []
 
-    for key, item_data in data.items():
-        if not isinstance(item_data, dict):
-            continue
-
+    for key, item_data in _dict_children(data):
         # Auto modifiers have monthly_towards_* directly in the item dict
         effects = utils.extract_value_effects(item_data)
 
@@ -672,7 +765,7 @@ def extract_auto_modifiers_from_data(data: dict, source: str) -> list:
 
         # Extract conditions from potential_trigger
         requirements = {}
-        if 'potential_trigger' in item_data and isinstance(item_data['potential_trigger'], dict):
+        if 'potential_trigger' in item_data and type(item_data['potential_trigger']) is dict:
             utils._extract_trigger_requirements(item_data['potential_trigger'], requirements)
 
         requirements = utils.resolve_advance_requirements(requirements)
@@ -693,17 +786,14 @@ def extract_parliament_agendas_from_data(data: dict, source: str) -> list:
     """Extract parliament agendas - these use change_societal_value in on_accept."""
     items = []
 
-    for key, item_data in data.items():
-        if not isinstance(item_data, dict):
-            continue
-
+    for key, item_data in _dict_children(data):
         # Parliament agendas have change_societal_value in on_accept
-        on_accept = item_data.get('on_accept', {})
-        if not isinstance(on_accept, dict):
+        on_accept = item_data.get('on_accept')
+        if type(on_accept) is not dict:
             continue
 
-        change_sv = on_accept.get('change_societal_value', {})
-        if not isinstance(change_sv, dict):
+        change_sv = on_accept.get('change_societal_value')
+        if type(change_sv) is not dict:
             continue
 
         sv_type = change_sv.get('type')
@@ -714,27 +804,20 @@ def extract_parliament_agendas_from_data(data: dict, source: str) -> list:
 
         # Parse the value type and direction
         # Format: societal_value_minor_move_to_left
-        direction = 'left' if 'to_left' in str(sv_value) else 'right'
+        value_name = str(sv_value)
+        direction = 'left' if 'to_left' in value_name else 'right'
 
         # Determine strength from value name
-        strength = None
+        strength = _classify_strength(value_name)
         strength_raw = sv_value
-        if 'tiny' in str(sv_value):
-            strength = 0.02
-        elif 'minor' in str(sv_value):
-            strength = 0.05
-        elif 'large' in str(sv_value):
-            strength = 0.20
-        else:
-            strength = 0.10  # default "move"
 
         # The sv_type format is like "centralization_vs_decentralization"
         value_pair = sv_type
 
         # Determine target side
         if value_pair and '_vs_' in value_pair:
-            parts = value_pair.split('_vs_')
-            target = parts[0] if direction == 'left' else ('_'.join(parts[1:]) if len(parts) > 1 else parts[0])
+            left_id, _, right_id = value_pair.partition('_vs_')
+            target = left_id if direction == 'left' else right_id.replace('_vs_', '_')
         else:
             target = value_pair
 
@@ -750,9 +833,14 @@ def extract_parliament_agendas_from_data(data: dict, source: str) -> list:
         requirements = {}
         estate = item_data.get('estate')
         if estate:
-            requirements['estate'] = [estate] if isinstance(estate, str) else estate
-
-        if 'potential' in item_data and isinstance(item_data['potential'], dict):
+            if isinstance(estate, str):
+                requirements['estate'] = [estate]
+            elif type(estate) is list:
+                requirements['estate'] = list(estate)  # A copy, more may be added to it
+            else:
+                requirements['estate'] = estate
+
+        if 'potential' in item_data and type(item_data['potential']) is dict:
             utils._extract_trigger_requirements(item_data['potential'], requirements)
 
         requirements = utils.resolve_advance_requirements(requirements)
@@ -779,34 +867,33 @@ def extract_events_from_data(data: dict, source: str) -> list:
     """
     items = []
 
-    for event_id, event_data in data.items():
-        if not isinstance(event_data, dict):
-            continue
-
+    for event_id, event_data in _dict_children(data):
         # Skip namespace declarations
         if event_id == 'namespace':
             continue
 
         # Extract trigger requirements
         base_requirements = {}
-        if 'trigger' in event_data and isinstance(event_data['trigger'], dict):
+        if 'trigger' in event_data and type(event_data['trigger']) is dict:
             _extract_event_trigger(event_data['trigger'], base_requirements)
 
         # Check for dynamic_historical_event tag restrictions
         if 'dynamic_historical_event' in event_data:
             dhe = event_data['dynamic_historical_event']
-            if isinstance(dhe, dict):
+            if type(dhe) is dict:
                 if 'tag' in dhe:
                     tag = dhe['tag']
                     if isinstance(tag, str):
                         base_requirements.setdefault('country', []).append(tag)
-                    elif isinstance(tag, list):
+                    elif type(tag) is list:
                         base_requirements.setdefault('country', []).extend(tag)
 
-        # Extract from each option
+        # Extract from each option. The display name and resolved requirements
+        # are the same for every option, so they're worked out on first use.
+        pretty_event_id = None
         option_num = 0
         for key, value in event_data.items():
-            if key == 'option' and isinstance(value, dict):
+            if key == 'option' and type(value) is dict:
                 option_num += 1
                 effects = _extract_event_option_value_effects(value)
                 if effects:
@@ -816,12 +903,14 @@ def extract_events_from_data(data: dict, source: str) -> list:
                         parts = option_name.split('.')
                         option_name = parts[-1] if parts[-1] else option_name
 
+                    if pretty_event_id is None:
+                        pretty_event_id = utils.prettify_id(event_id)
+                        base_requirements = utils.resolve_advance_requirements(base_requirements)
                     requirements = base_requirements.copy()
-                    requirements = utils.resolve_advance_requirements(requirements)
 
                     items.append({
                         'id': f"{event_id}_{option_name}",
-                        'name': f"{utils.prettify_id(event_id)} ({option_name})",
+                        'name': f"{pretty_event_id} ({option_name})",
                         'type': 'event_choice',
                         'source': source,
                         'event_id': event_id,
@@ -852,27 +941,16 @@ def _extract_event_option_value_effects(option: dict) -> list:
     effects = []
 
     def find_value_changes(d: dict):
-        """Recursively find change_societal_value blocks."""
-        if not isinstance(d, dict):
-            return
-
-        if 'change_societal_value' in d:
-            csv = d['change_societal_value']
-            if isinstance(csv, dict):
-                process_csv(csv)
-            elif isinstance(csv, list):
-                for item in csv:
-                    if isinstance(item, dict):
-                        process_csv(item)
-
-        # Recurse into nested blocks
-        for key, value in d.items():
-            if isinstance(value, dict):
-                find_value_changes(value)
-            elif isinstance(value, list):
-                for item in value:
-                    if isinstance(item, dict):
-                        find_value_changes(item)
+        """Find change_societal_value blocks anywhere under d, in file order."""
+        for block in _walk_blocks(d):
+            if 'change_societal_value' in block:
+                csv = block['change_societal_value']
+                if type(csv) is dict:
+                    process_csv(csv)
+                elif type(csv) is list:
+                    for item in csv:
+                        if type(item) is dict:
+                            process_csv(item)
 
     def process_csv(csv: dict):
         sv_type = csv.get('type')
@@ -881,25 +959,16 @@ def _extract_event_option_value_effects(option: dict) -> list:
         if not sv_type or not sv_value:
             return
 
-        direction = 'left' if 'to_left' in str(sv_value) else 'right'
+        value_name = str(sv_value)
+        direction = 'left' if 'to_left' in value_name else 'right'
 
         # Determine strength from value name
-        strength = None
-        if 'tiny' in str(sv_value):
-            strength = 0.02
-        elif 'minor' in str(sv_value):
-            strength = 0.05
-        elif 'large' in str(sv_value):
-            strength = 0.20
-        elif 'huge' in str(sv_value):
-            strength = 0.50
-        else:
-            strength = 0.10
+        strength = _classify_strength(value_name)
 
         value_pair = sv_type
         if value_pair and '_vs_' in value_pair:
-            parts = value_pair.split('_vs_')
-            target = parts[0] if direction == 'left' else ('_'.join(parts[1:]) if len(parts) > 1 else parts[0])
+            left_id, _, right_id = value_pair.partition('_vs_')
+            target = left_id if direction == 'left' else right_id.replace('_vs_', '_')
         else:
             target = value_pair
 
@@ -917,74 +986,51 @@ def _extract_event_option_value_effects(option: dict) -> list:
 
 def extract_generic_from_data(data: dict, source: str, item_type: str) -> list:
     """Generic extractor for any item type with modifiers."""
-    items = []
-
-    def find_modifiers(d: dict, path: str = "") -> list:
-        """Recursively find all modifier blocks with value effects."""
-        results = []
-
-        if not isinstance(d, dict):
-            return results
-
-        # Check all common modifier keys
-        modifier_keys = [
-            'country_modifier', 'modifier', 'province_modifier', 'effect',
-            'capital_country_modifier', 'modifier_when_in_debate', 'high_power',
-            'low_power', 'satisfaction', 'location_modifier', 'area_modifier'
-        ]
-
-        for mod_key in modifier_keys:
-            if mod_key in d and isinstance(d[mod_key], dict):
-                effects = utils.extract_value_effects(d[mod_key])
-                if effects:
-                    results.append((path, d, effects))
-
-        # Recurse into nested dicts
-        for key, value in d.items():
-            if isinstance(value, dict):
-                nested_path = f"{path}.{key}" if path else key
-                results.extend(find_modifiers(value, nested_path))
-            elif isinstance(value, list):
-                for i, item in enumerate(value):
-                    if isinstance(item, dict):
-                        nested_path = f"{path}.{key}[{i}]" if path else f"{key}[{i}]"
-                        results.extend(find_modifiers(item, nested_path))
-
-        return results
-
-    for key, item_data in data.items():
-        if not isinstance(item_data, dict):
+    items = {}  # id -> item, the first one found for each id wins
+
+    def find_modifiers(d: dict) -> Iterator[tuple]:
+        """Find the modifier blocks with value effects anywhere under d.
+
+        Yields (context, effects) pairs in file order, context being the
+        block the modifier was found in.
+        """
+        for block in _walk_blocks(d):
+            # Check all common modifier keys
+            for mod_key in _GENERIC_MODIFIER_KEYS:
+                if mod_key in block and type(block[mod_key]) is dict:
+                    effects = utils.extract_value_effects(block[mod_key])
+                    if effects:
+                        yield block, effects
+
+    for key, item_data in _dict_children(data):
+        # Use the top-level key as the item ID
+        item_id = key.split('.')[0]
+
+        # Only the first modifier block found for an ID is kept, so there's
+        # nothing more to do once an ID has an item
+        if item_id in items:
             continue
 
-        # Find all modifier blocks with value effects
-        found = find_modifiers(item_data, key)
-
-        for path, context, effects in found:
-            # Use the top-level key as the item ID
-            item_id = path.split('.')[0] if '.' in path else path
-
-            # Extract requirements from context
-            requirements = utils.extract_requirements(context)
-            requirements = utils.resolve_advance_requirements(requirements)
+        # Find the first modifier block with value effects, the search stops there
+        found = next(find_modifiers(item_data), None)
+        if found is None:
+            continue
+        context, effects = found
 
-            items.append({
-                'id': item_id,
-                'name': utils.prettify_id(item_id),
-                'type': item_type,
-                'source': source,
-                'value_effects': effects,
-                'requirements': requirements
-            })
+        # Extract requirements from context
+        requirements = utils.extract_requirements(context)
+        requirements = utils.resolve_advance_requirements(requirements)
 
-    # Deduplicate by id
-    seen = set()
-    unique_items = []
-    for item in items:
-        if item['id'] not in seen:
-            seen.add(item['id'])
-            unique_items.append(item)
+        items[item_id] = {
+            'id': item_id,
+            'name': utils.prettify_id(item_id),
+            'type': item_type,
+            'source': source,
+            'value_effects': effects,
+            'requirements': requirements
+        }
 
-    return unique_items
+    return list(items.values())
 
 
 def main():
@@ -1008,208 +1054,102 @@ def main():
     estates = extract_estates()
 
     # Step 2.5: Extract advance definitions (needed before movers for requirement resolution)
-    extract_advances_definitions()
-
-    # Step 3: Extract value movers from all sources
+    advance_files = extract_advances_definitions()
+
+    # Step 3: Extract value movers from all sources, in this order. Each is
+    # a directory or a single .txt file under COMMON_PATH, skipped if missing
+    mover_sources = [
+        ("government reforms", "government_reforms", extract_reforms_from_data),
+        ("laws", "laws", extract_laws_from_data),
+        ("estate privileges", "estate_privileges", extract_privileges_from_data),
+        ("traits", "traits", extract_traits_from_data),
+        ("buildings", "building_types", extract_buildings_from_data),
+        ("religious aspects", "religious_aspects", extract_religious_aspects_from_data),
+        ("parliament issues", "parliament_issues", extract_parliament_issues_from_data),
+        # Specialized extractor - monthly_towards at top level
+        ("auto modifiers", "auto_modifiers/country.txt", extract_auto_modifiers_from_data),
+        # One-time value changes
+        ("parliament agendas", "parliament_agendas", extract_parliament_agendas_from_data),
+        ("employment systems", "employment_systems/00_default.txt",
+         lambda d, s: extract_generic_from_data(d, s, "employment_system")),
+        ("cabinet actions", "cabinet_actions",
+         lambda d, s: extract_generic_from_data(d, s, "cabinet_action")),
+        ("regencies", "regencies",
+         lambda d, s: extract_generic_from_data(d, s, "regency")),
+        ("disasters", "disasters",
+         lambda d, s: extract_generic_from_data(d, s, "disaster")),
+        ("religious schools", "religious_schools",
+         lambda d, s: extract_generic_from_data(d, s, "religious_school")),
+        ("estate modifiers", "estates/00_default.txt",
+         lambda d, s: extract_generic_from_data(d, s, "estate_modifier")),
+        ("international organizations", "international_organizations",
+         lambda d, s: extract_generic_from_data(d, s, "international_org")),
+        ("generic actions", "generic_actions",
+         lambda d, s: extract_generic_from_data(d, s, "generic_action")),
+        # Informational only - these are transient
+        ("missions", "missions",
+         lambda d, s: extract_generic_from_data(d, s, "mission")),
+        # Country specific
+        ("advances", "advances",
+         lambda d, s: extract_generic_from_data(d, s, "advance")),
+        ("subject types", "subject_types",
+         lambda d, s: extract_generic_from_data(d, s, "subject_type")),
+    ]
+
+    # Parsing of the next directory's files is started before a source is
+    # extracted, so the worker processes go straight on to it. Only one ahead,
+    # the parsed files would pile up waiting otherwise. The advance files were
+    # parsed for their definitions already.
+    queued = {COMMON_PATH / "advances": iter(advance_files)}
     all_movers = []
+    for index, (category, name, extractor_fn) in enumerate(mover_sources):
+        path = COMMON_PATH / name
+        if not path.exists():
+            continue
 
-    # Government Reforms
-    reforms = extract_value_movers(
-        "government reforms",
-        COMMON_PATH / "government_reforms",
-        extract_reforms_from_data
-    )
-    all_movers.extend(reforms)
-
-    # Laws
-    laws = extract_value_movers(
-        "laws",
-        COMMON_PATH / "laws",
-        extract_laws_from_data
-    )
-    all_movers.extend(laws)
-
-    # Estate Privileges
-    privileges = extract_value_movers(
-        "estate privileges",
-        COMMON_PATH / "estate_privileges",
-        extract_privileges_from_data
-    )
-    all_movers.extend(privileges)
-
-    # Traits
-    traits = extract_value_movers(
-        "traits",
-        COMMON_PATH / "traits",
-        extract_traits_from_data
-    )
-    all_movers.extend(traits)
-
-    # Buildings
-    buildings = extract_value_movers(
-        "buildings",
-        COMMON_PATH / "building_types",
-        extract_buildings_from_data
-    )
-    all_movers.extend(buildings)
-
-    # Religious Aspects
-    religious = extract_value_movers(
-        "religious aspects",
-        COMMON_PATH / "religious_aspects",
-        extract_religious_aspects_from_data
-    )
-    all_movers.extend(religious)
-
-    # Parliament Issues
-    parliament = extract_value_movers(
-        "parliament issues",
-        COMMON_PATH / "parliament_issues",
-        extract_parliament_issues_from_data
-    )
-    all_movers.extend(parliament)
-
-    # Auto Modifiers (specialized extractor - monthly_towards at top level)
-    print("Extracting auto modifiers...")
-    auto_mod_file = COMMON_PATH / "auto_modifiers" / "country.txt"
-    if auto_mod_file.exists():
-        try:
-            data = parse_file(auto_mod_file)
-            auto_mods = extract_auto_modifiers_from_data(data, "auto_modifiers")
-            all_movers.extend(auto_mods)
-            print(f"  Found {len(auto_mods)} auto modifiers with value effects")
-        except Exception as e:
-            print(f"  Warning: Failed to parse auto modifiers: {e}")
-
-    # Parliament Agendas (one-time value changes)
-    parliament_agendas = extract_value_movers(
-        "parliament agendas",
-        COMMON_PATH / "parliament_agendas",
-        extract_parliament_agendas_from_data
-    )
-    all_movers.extend(parliament_agendas)
-
-    # Employment Systems
-    print("Extracting employment systems...")
-    emp_file = COMMON_PATH / "employment_systems" / "00_default.txt"
-    if emp_file.exists():
-        try:
-            data = parse_file(emp_file)
-            emp_items = extract_generic_from_data(data, "employment_systems", "employment_system")
-            all_movers.extend(emp_items)
-            print(f"  Found {len(emp_items)} employment systems with value effects")
-        except Exception as e:
-            print(f"  Warning: Failed to parse employment systems: {e}")
-
-    # Cabinet Actions
-    cabinet = extract_value_movers(
-        "cabinet actions",
-        COMMON_PATH / "cabinet_actions",
-        lambda d, s: extract_generic_from_data(d, s, "cabinet_action")
-    )
-    all_movers.extend(cabinet)
-
-    # Regencies
-    regencies = extract_value_movers(
-        "regencies",
-        COMMON_PATH / "regencies",
-        lambda d, s: extract_generic_from_data(d, s, "regency")
-    )
-    all_movers.extend(regencies)
-
-    # Disasters
-    disasters = extract_value_movers(
-        "disasters",
-        COMMON_PATH / "disasters",
-        lambda d, s: extract_generic_from_data(d, s, "disaster")
-    )
-    all_movers.extend(disasters)
-
-    # Religious Schools
-    if (COMMON_PATH / "religious_schools").exists():
-        r_schools = extract_value_movers(
-            "religious schools",
-            COMMON_PATH / "religious_schools",
-            lambda d, s: extract_generic_from_data(d, s, "religious_school")
-        )
-        all_movers.extend(r_schools)
-
-    # Estates base (00_default.txt)
-    print("Extracting estates base modifiers...")
-    estates_file = COMMON_PATH / "estates" / "00_default.txt"
-    if estates_file.exists():
-        try:
-            data = parse_file(estates_file)
-            estate_mods = extract_generic_from_data(data, "estates", "estate_modifier")
-            all_movers.extend(estate_mods)
-            print(f"  Found {len(estate_mods)} estate modifiers with value effects")
-        except Exception as e:
-            print(f"  Warning: Failed to parse estates: {e}")
-
-    # International Organizations
-    if (COMMON_PATH / "international_organizations").exists():
-        io_items = extract_value_movers(
-            "international organizations",
-            COMMON_PATH / "international_organizations",
-            lambda d, s: extract_generic_from_data(d, s, "international_org")
-        )
-        all_movers.extend(io_items)
-
-    # Generic Actions
-    if (COMMON_PATH / "generic_actions").exists():
-        generic = extract_value_movers(
-            "generic actions",
-            COMMON_PATH / "generic_actions",
-            lambda d, s: extract_generic_from_data(d, s, "generic_action")
-        )
-        all_movers.extend(generic)
-
-    # Missions (informational only - these are transient)
-    if (COMMON_PATH / "missions").exists():
-        missions = extract_value_movers(
-            "missions",
-            COMMON_PATH / "missions",
-            lambda d, s: extract_generic_from_data(d, s, "mission")
-        )
-        all_movers.extend(missions)
-
-    # Advances (country specific)
-    if (COMMON_PATH / "advances").exists():
-        advances = extract_value_movers(
-            "advances",
-            COMMON_PATH / "advances",
-            lambda d, s: extract_generic_from_data(d, s, "advance")
-        )
-        all_movers.extend(advances)
-
-    # Subject Types
-    if (COMMON_PATH / "subject_types").exists():
-        subjects = extract_value_movers(
-            "subject types",
-            COMMON_PATH / "subject_types",
-            lambda d, s: extract_generic_from_data(d, s, "subject_type")
-        )
-        all_movers.extend(subjects)
+        if path.suffix == '.txt':
+            parsed = None
+        else:
+            parsed = queued.pop(path, None)
+            if parsed is None:
+                parsed = parse_files(sorted(path.glob("*.txt")))
+
+        for _, next_name, _ in mover_sources[index + 1:]:
+            next_path = COMMON_PATH / next_name
+            if next_path.suffix != '.txt' and next_path.exists():
+                if next_path not in queued:
+                    queued[next_path] = parse_files(sorted(next_path.glob("*.txt")))
+                break
+
+        if path.suffix == '.txt':
+            all_movers.extend(extract_file_movers(category, path, extractor_fn))
+        else:
+            all_movers.extend(extract_value_movers(category, path, extractor_fn, parsed))
 
     # Events (one-time value changes from player choices)
     if EVENTS_PATH.exists():
         print("Extracting events...")
         event_count = 0
+        event_paths = []
         for subdir in ['', 'DHE', 'disaster', 'economy', 'estates', 'government',
                        'religion', 'situations', 'culture', 'character', 'missionevents',
                        'exploration']:
             event_dir = EVENTS_PATH / subdir if subdir else EVENTS_PATH
             if event_dir.exists():
-                for filepath in sorted(event_dir.glob("*.txt")):
-                    try:
-                        data = parse_file(filepath)
-                        events = extract_events_from_data(data, filepath.stem)
-                        if events:
-                            all_movers.extend(events)
-                            event_count += len(events)
-                    except Exception as e:
-                        # Silently skip parse errors for events (there are many)
-                        pass
+                event_paths.extend(sorted(event_dir.glob("*.txt")))
+
+        # Parse the files of all subdirectories as one batch
+        for filepath, data, error in parse_files(event_paths):
+            try:
+                if error is not None:
+                    raise error
+                events = extract_events_from_data(data, filepath.stem)
+                if events:
+                    all_movers.extend(events)
+                    event_count += len(events)
+            except Exception as e:
+                # Silently skip parse errors for events (there are many)
+                pass
         print(f"  Found {event_count} event choices with value effects")
 
     # Write output files
@@ -1220,8 +1160,20 @@ def main():
 
     def write_json(filename: str, data: Any):
         filepath = OUTPUT_PATH / filename
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        content = None
+        if orjson is not None:
+            # UTF-8 with a two-space indent, like json.dump() below. Floats in
+            # exponent form are written differently (0.00001 for 1e-05, 1e16
+            # for 1e+16), and inf/nan become null instead of Infinity/NaN
+            try:
+                content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            except orjson.JSONEncodeError:
+                pass  # Integers beyond 64 bits, which json can write
+        if content is not None:
+            filepath.write_bytes(content)
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
         print(f"  Wrote {filepath}")
 
     write_json("values.json", values)
@@ -1246,14 +1198,11 @@ def main():
     print(f"  Value movers:       {len(all_movers)}")
 
     # Count by type
-    by_type = {}
-    for mover in all_movers:
-        t = mover['type']
-        by_type[t] = by_type.get(t, 0) + 1
+    by_type = Counter(mover['type'] for mover in all_movers)
 
     print()
     print("  Movers by type:")
-    for t, count in sorted(by_type.items(), key=lambda x: -x[1]):
+    for t, count in by_type.most_common():
         print(f"    {t}: {count}")
 
     print()
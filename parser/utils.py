@@ -3,6 +3,7 @@ Utility functions for the EU5 Values Viewer parser.
 """
 
 import re
+from functools import lru_cache
 from typing import Optional
 
 # Known strength modifier mappings (estimated values based on game file analysis)
@@ -17,21 +18,56 @@ STRENGTH_VALUES = {
 # Value name mappings (left side of value pair -> full pair name)
 VALUE_SIDES = {}  # Will be populated by values extractor
 
+# Prefix of the modifiers that move a societal value, followed by the side
+_TOWARDS_PREFIX = 'monthly_towards_'
+_TOWARDS_PREFIX_LEN = len(_TOWARDS_PREFIX)
+
 # Advances and their requirements (populated by parser)
 ADVANCES = {}  # advance_id -> {requirements: {...}, age: str}
 
+# Resolved requirements, keyed and stored as tuples of (key, value) pairs with
+# lists turned into tuples
+_resolved_cache = {}
+
 
 def resolve_advance_requirements(requirements: dict) -> dict:
     """
     If requirements include has_advance, look up the advance's requirements
     and merge them into the item's requirements.
+
+    Many items share the same requirements, so results are cached - ADVANCES
+    must be complete before the first call.
     """
     if 'has_advance' not in requirements or not requirements['has_advance']:
         return requirements
 
+    try:
+        key = _freeze_requirements(requirements)
+        cached = _resolved_cache.get(key)
+    except TypeError:
+        # Unhashable values (nested blocks), resolve without caching
+        return _resolve_advance_requirements(requirements)
+
+    if cached is None:
+        requirements = _resolve_advance_requirements(requirements)
+        _resolved_cache[key] = _freeze_requirements(requirements)
+        return requirements
+
+    # Fresh lists every time, callers may modify what they get back
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in cached}
+
+
+def _freeze_requirements(requirements: dict) -> tuple:
+    """Turn requirements into a (key, value) tuple, with lists as tuples."""
+    return tuple((k, tuple(v) if isinstance(v, list) else v)
+                 for k, v in requirements.items())
+
+
+def _resolve_advance_requirements(requirements: dict) -> dict:
+    """Merge advance requirements into requirements, in place."""
     for advance_id in requirements['has_advance']:
-        if advance_id in ADVANCES:
-            advance_data = ADVANCES[advance_id]
+        advance_data = ADVANCES.get(advance_id)
+        if advance_data is not None:
             advance_reqs = advance_data.get('requirements', {})
 
             # Merge advance requirements into item requirements
@@ -61,17 +97,45 @@ def resolve_advance_requirements(requirements: dict) -> dict:
     return requirements
 
 
+# Scope prefixes prettify_id() strips from IDs, in order
+_ID_PREFIXES = (
+    'government_reform:', 'estate_privilege:', 'law:', 'policy:',
+    'trait:', 'building:', 'religion:', 'culture:', 'advance:'
+)
+
+# Fixes prettify_id() applies to title-cased names, in order
+_NAME_REPLACEMENTS = (
+    (' Vs ', ' vs '),
+    (' Of ', ' of '),
+    (' The ', ' the '),
+    (' And ', ' and '),
+    (' For ', ' for '),
+    (' To ', ' to '),
+    (' In ', ' in '),
+    (' On ', ' on '),
+    (' A ', ' a '),
+    (' An ', ' an '),
+    ('Hre ', 'HRE '),
+    (' Hre', ' HRE'),
+    ('Dop ', ''),  # Remove "Distribution of Power" prefix
+    ('Io ', 'IO '),
+    (' Io', ' IO'),
+    ('Ai ', 'AI '),
+    (' Ai', ' AI'),
+)
+
+
+@lru_cache(maxsize=8192)
 def prettify_id(id_str: str) -> str:
-    """Convert a game ID to a human-readable display name."""
+    """Convert a game ID to a human-readable display name.
+
+    Results are cached, the same IDs get prettified over and over.
+    """
     if not id_str:
         return id_str
 
     # Remove common prefixes
-    prefixes = [
-        'government_reform:', 'estate_privilege:', 'law:', 'policy:',
-        'trait:', 'building:', 'religion:', 'culture:', 'advance:'
-    ]
-    for prefix in prefixes:
+    for prefix in _ID_PREFIXES:
         if id_str.startswith(prefix):
             id_str = id_str[len(prefix):]
 
@@ -82,26 +146,7 @@ def prettify_id(id_str: str) -> str:
     name = name.title()
 
     # Fix common terms
-    replacements = {
-        ' Vs ': ' vs ',
-        ' Of ': ' of ',
-        ' The ': ' the ',
-        ' And ': ' and ',
-        ' For ': ' for ',
-        ' To ': ' to ',
-        ' In ': ' in ',
-        ' On ': ' on ',
-        ' A ': ' a ',
-        ' An ': ' an ',
-        'Hre ': 'HRE ',
-        ' Hre': ' HRE',
-        'Dop ': '',  # Remove "Distribution of Power" prefix
-        'Io ': 'IO ',
-        ' Io': ' IO',
-        'Ai ': 'AI ',
-        ' Ai': ' AI',
-    }
-    for old, new in replacements.items():
+    for old, new in _NAME_REPLACEMENTS:
         name = name.replace(old, new)
 
     # Ensure first letter is capitalized
@@ -145,12 +190,14 @@ def extract_value_effects(modifiers: dict) -> list:
     if not isinstance(modifiers, dict):
         return effects
 
+    value_sides = VALUE_SIDES  # Looked up for every modifier below
+
     for key, value in modifiers.items():
-        if key.startswith('monthly_towards_'):
-            value_side = key[len('monthly_towards_'):]
+        if key.startswith(_TOWARDS_PREFIX):
+            value_side = key[_TOWARDS_PREFIX_LEN:]
 
-            # Determine the value pair and direction
-            value_pair, direction = find_value_pair(value_side)
+            # Determine the value pair and direction (same as find_value_pair)
+            value_pair, direction = value_sides.get(value_side, (None, None))
 
             if value_pair:
                 strength = get_strength_value(value)
@@ -173,9 +220,7 @@ def find_value_pair(value_side: str) -> tuple:
         (value_pair_id, 'left'|'right') or (None, None) if not found
     """
     # Will be populated after values are extracted
-    if value_side in VALUE_SIDES:
-        return VALUE_SIDES[value_side]
-    return (None, None)
+    return VALUE_SIDES.get(value_side, (None, None))
 
 
 def extract_requirements(data: dict) -> dict:
@@ -194,7 +239,8 @@ def extract_requirements(data: dict) -> dict:
     if 'government' in data:
         gov = data['government']
         if isinstance(gov, list):
-            requirements['government'] = gov
+            # A copy, trigger requirements get added to this list below
+            requirements['government'] = list(gov)
         else:
             requirements['government'] = [gov]
 
@@ -213,63 +259,44 @@ def extract_requirements(data: dict) -> dict:
     return requirements
 
 
+# Trigger keys whose values are copied into requirements, in order, as
+# (trigger key, requirement key, lists allowed, strip "scope:" from strings).
+# has_government_type, which holds a block, is handled between the two.
+_TRIGGER_KEYS_BEFORE_GOVERNMENT = (
+    ('religion', 'religion', True, False),
+    ('religion_group', 'religion_group', True, False),
+    ('tag', 'country', True, False),  # Both 'tag' and 'has_or_had_tag'
+    ('has_or_had_tag', 'country', True, False),
+    ('has_reform', 'has_reform', True, False),
+    ('has_privilege', 'has_privilege', True, False),
+    ('government_type', 'government', False, True),  # "government_type:monarchy"
+)
+_TRIGGER_KEYS_AFTER_GOVERNMENT = (
+    ('culture', 'culture', True, False),
+    ('culture_group', 'culture_group', True, True),
+    ('has_culture_group', 'culture_group', False, True),
+    ('estate', 'estate', True, False),
+    ('has_advance', 'has_advance', True, False),  # Technology/unlock requirement
+)
+
+
+def _copy_trigger_values(trigger: dict, requirements: dict, keys: tuple):
+    """Copy string and list values of the given trigger keys into requirements."""
+    for key, requirement_key, lists, strip in keys:
+        if key not in trigger:
+            continue
+        value = trigger[key]
+        if isinstance(value, str):
+            if strip and ':' in value:
+                value = value.split(':')[1]
+            requirements.setdefault(requirement_key, []).append(value)
+        elif lists and isinstance(value, list):
+            requirements.setdefault(requirement_key, []).extend(value)
+
+
 def _extract_trigger_requirements(trigger: dict, requirements: dict):
     """Extract requirements from a trigger block."""
-
-    # Religion
-    if 'religion' in trigger:
-        rel = trigger['religion']
-        if isinstance(rel, list):
-            requirements.setdefault('religion', []).extend(rel)
-        elif isinstance(rel, str):
-            requirements.setdefault('religion', []).append(rel)
-
-    if 'religion_group' in trigger:
-        rg = trigger['religion_group']
-        if isinstance(rg, list):
-            requirements.setdefault('religion_group', []).extend(rg)
-        elif isinstance(rg, str):
-            requirements.setdefault('religion_group', []).append(rg)
-
-    # Country tag - both 'tag' and 'has_or_had_tag'
-    if 'tag' in trigger:
-        tag = trigger['tag']
-        if isinstance(tag, list):
-            requirements.setdefault('country', []).extend(tag)
-        elif isinstance(tag, str):
-            requirements.setdefault('country', []).append(tag)
-
-    if 'has_or_had_tag' in trigger:
-        tag = trigger['has_or_had_tag']
-        if isinstance(tag, list):
-            requirements.setdefault('country', []).extend(tag)
-        elif isinstance(tag, str):
-            requirements.setdefault('country', []).append(tag)
-
-    # Has reform
-    if 'has_reform' in trigger:
-        reform = trigger['has_reform']
-        if isinstance(reform, list):
-            requirements.setdefault('has_reform', []).extend(reform)
-        elif isinstance(reform, str):
-            requirements.setdefault('has_reform', []).append(reform)
-
-    # Has privilege
-    if 'has_privilege' in trigger:
-        priv = trigger['has_privilege']
-        if isinstance(priv, list):
-            requirements.setdefault('has_privilege', []).extend(priv)
-        elif isinstance(priv, str):
-            requirements.setdefault('has_privilege', []).append(priv)
-
-    # Government type in trigger
-    if 'government_type' in trigger:
-        gov = trigger['government_type']
-        if isinstance(gov, str):
-            # Handle "government_type:monarchy" format
-            if ':' in gov:
-                gov = gov.split(':')[1]
-            requirements.setdefault('government', []).append(gov)
+    _copy_trigger_values(trigger, requirements, _TRIGGER_KEYS_BEFORE_GOVERNMENT)
 
     if 'has_government_type' in trigger:
         gov_data = trigger['has_government_type']
@@ -279,49 +306,7 @@ def _extract_trigger_requirements(trigger: dict, requirements: dict):
                 gov = gov.split(':')[1]
             requirements.setdefault('government', []).append(gov)
 
-    # Culture
-    if 'culture' in trigger:
-        culture = trigger['culture']
-        if isinstance(culture, list):
-            requirements.setdefault('culture', []).extend(culture)
-        elif isinstance(culture, str):
-            requirements.setdefault('culture', []).append(culture)
-
-    if 'culture_group' in trigger:
-        cg = trigger['culture_group']
-        if isinstance(cg, list):
-            requirements.setdefault('culture_group', []).extend(cg)
-        elif isinstance(cg, str):
-            # Handle "culture_group:xxx" format
-            if ':' in cg:
-                cg = cg.split(':')[1]
-            requirements.setdefault('culture_group', []).append(cg)
-
-    if 'has_culture_group' in trigger:
-        cg_data = trigger['has_culture_group']
-        if isinstance(cg_data, dict):
-            # Could have nested structure
-            pass
-        elif isinstance(cg_data, str):
-            if ':' in cg_data:
-                cg_data = cg_data.split(':')[1]
-            requirements.setdefault('culture_group', []).append(cg_data)
-
-    # Estate
-    if 'estate' in trigger:
-        estate = trigger['estate']
-        if isinstance(estate, list):
-            requirements.setdefault('estate', []).extend(estate)
-        elif isinstance(estate, str):
-            requirements.setdefault('estate', []).append(estate)
-
-    # Has advance (technology/unlock requirement)
-    if 'has_advance' in trigger:
-        advance = trigger['has_advance']
-        if isinstance(advance, list):
-            requirements.setdefault('has_advance', []).extend(advance)
-        elif isinstance(advance, str):
-            requirements.setdefault('has_advance', []).append(advance)
+    _copy_trigger_values(trigger, requirements, _TRIGGER_KEYS_AFTER_GOVERNMENT)
 
     # OR blocks - recurse into them to find requirements
     if 'OR' in trigger and isinstance(trigger['OR'], dict):